@@ -1,93 +1,212 @@
 #!/usr/bin/python3
 
-import argparse
-import subprocess
 import json
-import sys
-import inquirer
+import re
+import time
+import i3ipc
 import os
+from collections import namedtuple
 
-# Argument parser
-parser = argparse.ArgumentParser(description="Monitor Manager for Sway")
-args = parser.parse_args()
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 WORKSPACES_FILE = "/home/mwieland/.config/sway/workspaces.json"
 
+# Rotation choices offered for an output, shared by the monitor menus
+ROTATIONS = (
+    "normal",
+    "90",
+    "180",
+    "270",
+    "flipped",
+    "flipped-90",
+    "flipped-180",
+    "flipped-270",
+)
+ROTATIONS_WITH_NO_CHANGE = ("No Change",) + ROTATIONS
+
+# Single IPC connection to sway, shared by all commands and queries
+conn = i3ipc.Connection()
+
+
+def run_command(command):
+    # conn.command never raises on a failed command; it returns one reply
+    # per semicolon-separated part, so report any errors ourselves.
+    for reply in conn.command(command):
+        if not reply.success:
+            print(f"sway command failed: {reply.error}")
+
+
+# Output metadata precomputed once when sway's reply is ingested, so the
+# menu code reads plain fields instead of re-stripping strings per visit.
+Output = namedtuple("Output", "name description active transform x y")
+
+
+def _make_output(ipc_data):
+    make = ipc_data.get("make", "").strip()
+    model = ipc_data.get("model", "").strip()
+    serial = ipc_data.get("serial", "").strip()
+    rect = ipc_data.get("rect", {"x": 0, "y": 0})
+    return Output(
+        name=ipc_data["name"],
+        description=f"{make} {model} {serial}".strip(),
+        active=ipc_data["active"],
+        transform=ipc_data.get("transform", "normal"),
+        x=rect.get("x", 0),
+        y=rect.get("y", 0),
+    )
 
-def enable_monitor(monitor_name):
-    print(f"Enabling monitor: {monitor_name}")
-    subprocess.run(["swaymsg", "output", monitor_name, "enable"], check=True)
 
+# (timestamp, outputs) of the last get_outputs query, so repeated menu
+# visits don't re-query sway; cleared whenever we change an output.
+_outputs_cache = None
 
-def disable_monitor(monitor_name):
-    print(f"Disabling monitor: {monitor_name}")
-    subprocess.run(["swaymsg", "output", monitor_name, "disable"], check=True)
 
+def get_outputs(ttl=2.0):
+    global _outputs_cache
+    if _outputs_cache is not None and time.monotonic() - _outputs_cache[0] < ttl:
+        return _outputs_cache[1]
+    outputs = [_make_output(output.ipc_data) for output in conn.get_outputs()]
+    _outputs_cache = (time.monotonic(), outputs)
+    return outputs
 
-def set_rotation(output_name, rotation):
-    print(f"Setting rotation of {output_name} to {rotation}")
-    subprocess.run(
-        ["swaymsg", "output", output_name, "transform", rotation], check=True
-    )
 
+def invalidate_outputs_cache():
+    global _outputs_cache, _description_map_cache
+    _outputs_cache = None
+    _description_map_cache = None
 
-def set_position(output_name, x, y):
-    print(f"Setting position of {output_name} to ({x}, {y})")
-    subprocess.run(
-        ["swaymsg", "output", output_name, "position", str(x), str(y)], check=True
-    )
+
+# (outputs, map) pair derived from the outputs cache; rebuilt whenever
+# get_outputs returns a fresh list.
+_description_map_cache = None
+
+
+def get_description_map():
+    global _description_map_cache
+    outputs = get_outputs()
+    if _description_map_cache is None or _description_map_cache[0] is not outputs:
+        description_to_output = {
+            monitor.description: monitor.name for monitor in outputs
+        }
+        _description_map_cache = (outputs, description_to_output)
+    return _description_map_cache[1]
+
+
+# Matches a complete "x,y" entry; used to validate per keystroke without
+# running int() on every partial input.
+POSITION_RE = re.compile(r"^\s*-?\d+\s*,\s*-?\d+\s*$")
+
+
+def _parse_xy(position_input):
+    x_str, _, y_str = position_input.partition(",")
+    try:
+        return int(x_str.strip()), int(y_str.strip())
+    except ValueError:
+        return None
+
+
+# Parsed workspaces.json keyed by the file's mtime, so repeated loads
+# only re-read the file when it actually changed on disk.
+_workspaces_cache = {"mtime": None, "data": None}
 
 
 def load_workspaces():
     if not os.path.exists(WORKSPACES_FILE):
-        print(1)
         return {"workspaces": []}
+    mtime = os.stat(WORKSPACES_FILE).st_mtime_ns
+    if _workspaces_cache["mtime"] == mtime:
+        return _workspaces_cache["data"]
     try:
-        with open(WORKSPACES_FILE, "r") as f:
-            print(2)
-            return json.load(f)
+        with open(WORKSPACES_FILE, "rb") as f:
+            raw = f.read()
+            if orjson is not None:
+                data = orjson.loads(raw)
+            else:
+                data = json.loads(raw)
     except json.JSONDecodeError:
         print("Error parsing workspaces.json.")
         return {"workspaces": []}
+    _workspaces_cache["mtime"] = mtime
+    _workspaces_cache["data"] = data
+    return data
 
 
 def save_workspaces(workspaces_data):
-    with open(WORKSPACES_FILE, "w") as f:
-        json.dump(workspaces_data, f, indent=4)
+    # Write to a temp file and rename over the original so a crash
+    # mid-write can't leave a truncated workspaces.json behind.
+    tmp_file = WORKSPACES_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        if orjson is not None:
+            f.write(orjson.dumps(workspaces_data, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(workspaces_data, indent=4).encode())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, WORKSPACES_FILE)
+    _workspaces_cache["mtime"] = os.stat(WORKSPACES_FILE).st_mtime_ns
+    _workspaces_cache["data"] = workspaces_data
     print(f"Workspaces saved to {WORKSPACES_FILE}.")
 
 
+# inquirer (and its terminal dependencies) takes tens of milliseconds to
+# import, so it's loaded lazily the first time a prompt is needed. The
+# fixed menu questions are built once alongside it.
+inquirer = None
+MAIN_MENU_QUESTION = None
+WORKSPACE_MENU_QUESTION = None
+
+
+def _load_inquirer():
+    global inquirer, MAIN_MENU_QUESTION, WORKSPACE_MENU_QUESTION
+    if inquirer is not None:
+        return
+    import inquirer as _inquirer
+
+    inquirer = _inquirer
+    MAIN_MENU_QUESTION = [
+        inquirer.List(
+            "mode",
+            message="What do you want to do?",
+            choices=("Manage Monitors", "Manage Workspaces", "Exit"),
+        )
+    ]
+    WORKSPACE_MENU_QUESTION = [
+        inquirer.List(
+            "workspace_mode",
+            message="Workspace Management Options:",
+            choices=(
+                "Activate a Workspace",
+                "Create a New Workspace",
+                "Create Current Settings as Workspace",
+                "Delete a Workspace",
+                "Back to Main Menu",
+            ),
+        )
+    ]
+
+
 def menu():
+    _load_inquirer()
     while True:
-        question = [
-            inquirer.List(
-                "mode",
-                message="What do you want to do?",
-                choices=["Manage Monitors", "Manage Workspaces", "Exit"],
-            )
-        ]
-        answer = inquirer.prompt(question)
+        answer = inquirer.prompt(MAIN_MENU_QUESTION)
 
         if not answer:
             continue
 
-        if answer["mode"] == "Manage Monitors":
-            manage_monitors()
-        elif answer["mode"] == "Manage Workspaces":
-            manage_workspaces_menu()
-        elif answer["mode"] == "Exit":
-            sys.exit()
+        action = MAIN_MENU_ACTIONS.get(answer["mode"])
+        if action is None:  # Exit
+            raise SystemExit
+        action()
 
 
 def manage_monitors():
     try:
-        monitors_data = json.loads(
-            subprocess.run(
-                ["swaymsg", "-t", "get_outputs"], capture_output=True, text=True
-            ).stdout
-        )
-    except json.JSONDecodeError:
-        print("Failed to retrieve monitor information.")
+        monitors_data = get_outputs()
+    except (OSError, ValueError) as e:
+        print(f"Failed to retrieve monitor information: {e}")
         return
 
     if not monitors_data:
@@ -98,18 +217,10 @@ def manage_monitors():
     monitor_map = {}
 
     for monitor in monitors_data:
-        output_name = monitor["name"]
-        make = monitor.get("make", "").strip()
-        model = monitor.get("model", "").strip()
-        serial = monitor.get("serial", "").strip()
-        description = f"{make} {model} {serial}".strip()
-        active = monitor["active"]
-        transform = monitor.get("transform", "normal")
-        position = monitor.get("rect", {"x": 0, "y": 0})
-        x = position.get("x", 0)
-        y = position.get("y", 0)
-
-        monitor_info = f"{description} ({output_name}) - {active}, rot: {transform}, pos: ({x}, {y})"
+        monitor_info = (
+            f"{monitor.description} ({monitor.name}) - {monitor.active}, "
+            f"rot: {monitor.transform}, pos: ({monitor.x}, {monitor.y})"
+        )
         choices.append(monitor_info)
         monitor_map[monitor_info] = monitor
 
@@ -126,9 +237,11 @@ def manage_monitors():
         print("No monitors selected.")
         return
 
+    ops = []
+
     for monitor_info in answer["monitors"]:
         monitor = monitor_map[monitor_info]
-        output_name = monitor["name"]
+        output_name = monitor.name
 
         # Ask if the user wants to enable or disable the monitor
         state_question = [
@@ -148,17 +261,7 @@ def manage_monitors():
             inquirer.List(
                 "rotation",
                 message=f"Set rotation for {monitor_info}:",
-                choices=[
-                    "No Change",
-                    "normal",
-                    "90",
-                    "180",
-                    "270",
-                    "flipped",
-                    "flipped-90",
-                    "flipped-180",
-                    "flipped-270",
-                ],
+                choices=ROTATIONS_WITH_NO_CHANGE,
             )
         ]
         rotation_answer = inquirer.prompt(rotation_question)
@@ -177,11 +280,10 @@ def manage_monitors():
         if position_answer is not None:
             position_input = position_answer["position"].strip()
             if position_input:
-                try:
-                    x_str, y_str = position_input.split(",")
-                    x = int(x_str.strip())
-                    y = int(y_str.strip())
-                except ValueError:
+                parsed = _parse_xy(position_input)
+                if parsed is not None:
+                    x, y = parsed
+                else:
                     print("Invalid position format. Skipping position change.")
                     x = None
                     y = None
@@ -192,52 +294,50 @@ def manage_monitors():
             x = None
             y = None
 
-        # Apply the changes
-        if state_choice == "Enable":
-            enable_monitor(output_name)
-        elif state_choice == "Disable":
-            disable_monitor(output_name)
-
-        if rotation_choice != "No Change":
-            set_rotation(output_name, rotation_choice)
+        # Queue the changes, skipping anything already in effect. The
+        # cached transform/rect of a disabled output is stale, so the
+        # "already in effect" skip only applies to active outputs.
+        if state_choice == "Enable" and not monitor.active:
+            ops.append(f"output {output_name} enable")
+        elif state_choice == "Disable" and monitor.active:
+            ops.append(f"output {output_name} disable")
+
+        if rotation_choice != "No Change" and not (
+            monitor.active and rotation_choice == monitor.transform
+        ):
+            ops.append(f"output {output_name} transform {rotation_choice}")
+
+        if x is not None and y is not None and not (
+            monitor.active and (x, y) == (monitor.x, monitor.y)
+        ):
+            ops.append(f"output {output_name} position {x} {y}")
+
+    if not ops:
+        print("No changes to apply.")
+        return
 
-        if x is not None and y is not None:
-            set_position(output_name, x, y)
+    combined = "; ".join(ops)
+    print(f"Applying changes: {combined}")
+    run_command(combined)
+    invalidate_outputs_cache()
 
 
 def manage_workspaces_menu():
     while True:
-        question = [
-            inquirer.List(
-                "workspace_mode",
-                message="Workspace Management Options:",
-                choices=[
-                    "Activate a Workspace",
-                    "Create a New Workspace",
-                    "Create Current Settings as Workspace",
-                    "Delete a Workspace",
-                    "Back to Main Menu",
-                ],
-            )
-        ]
-        answer = inquirer.prompt(question)
+        answer = inquirer.prompt(WORKSPACE_MENU_QUESTION)
 
         if not answer:
             continue
 
         mode = answer["workspace_mode"]
 
-        if mode == "Activate a Workspace":
-            activate_workspace()
-        elif mode == "Create a New Workspace":
-            create_new_workspace()
-        elif mode == "Create Current Settings as Workspace":
-            create_current_as_workspace()
-        elif mode == "Delete a Workspace":
-            delete_workspace()
-        elif mode == "Back to Main Menu":
+        if mode == "Back to Main Menu":
             break
 
+        action = WORKSPACE_MENU_ACTIONS.get(mode)
+        if action is not None:
+            action()
+
 
 def activate_workspace():
     workspaces_data = load_workspaces()
@@ -246,13 +346,13 @@ def activate_workspace():
         print("No workspaces found in workspaces.json.")
         return
 
-    workspace_names = [ws["name"] for ws in workspaces_data["workspaces"]]
+    ws_by_name = {ws["name"]: ws for ws in workspaces_data["workspaces"]}
 
     question = [
         inquirer.List(
             "workspace",
             message="Select a workspace to activate:",
-            choices=workspace_names,
+            choices=list(ws_by_name),
         )
     ]
     answer = inquirer.prompt(question)
@@ -261,14 +361,7 @@ def activate_workspace():
     selected_workspace_name = answer["workspace"]
 
     # Find the selected workspace configuration
-    selected_workspace = next(
-        (
-            ws
-            for ws in workspaces_data["workspaces"]
-            if ws["name"] == selected_workspace_name
-        ),
-        None,
-    )
+    selected_workspace = ws_by_name.get(selected_workspace_name)
 
     if selected_workspace is None:
         print("Workspace not found.")
@@ -276,28 +369,17 @@ def activate_workspace():
 
     # Get current monitors data
     try:
-        monitors_data = json.loads(
-            subprocess.run(
-                ["swaymsg", "-t", "get_outputs"], capture_output=True, text=True
-            ).stdout
-        )
-    except json.JSONDecodeError:
-        print("Failed to retrieve monitor information.")
+        monitors_data = get_outputs()
+    except (OSError, ValueError) as e:
+        print(f"Failed to retrieve monitor information: {e}")
         return
 
     if not monitors_data:
         print("No monitors found.")
         return
 
-    # Build a mapping from description to output_name
-    description_to_output = {}
-    for monitor in monitors_data:
-        output_name = monitor["name"]
-        make = monitor.get("make", "").strip()
-        model = monitor.get("model", "").strip()
-        serial = monitor.get("serial", "").strip()
-        description = f"{make} {model} {serial}".strip()
-        description_to_output[description] = output_name
+    # Map each monitor description to its output_name
+    description_to_output = get_description_map()
 
     # Collect all output names from the workspace
     workspace_output_names = []
@@ -308,12 +390,11 @@ def activate_workspace():
             workspace_output_names.append(output_name)
 
     # **Deactivate monitors not in the workspace**
-    all_current_outputs = {monitor["name"] for monitor in monitors_data}
+    all_current_outputs = {monitor.name for monitor in monitors_data}
     workspace_outputs_set = set(workspace_output_names)
     monitors_to_disable = all_current_outputs - workspace_outputs_set
 
-    for output in monitors_to_disable:
-        disable_monitor(output)
+    commands = [f"output {output} disable" for output in monitors_to_disable]
 
     # Apply the workspace's monitor configurations
     for monitor_config in selected_workspace["monitors"]:
@@ -329,16 +410,23 @@ def activate_workspace():
             print(f"Monitor with description '{description}' not found.")
             continue
 
-        if state == "enable":
-            enable_monitor(output_name)
-        elif state == "disable":
-            disable_monitor(output_name)
-
+        # Chain the subcommands with spaces: sway treats "," like ";" in
+        # IPC command strings, so a comma-joined list would be parsed as
+        # separate top-level commands and rejected.
+        parts = [f"output {output_name} {state}"]
         if transform:
-            set_rotation(output_name, transform)
-
+            parts.append(f"transform {transform}")
         if x is not None and y is not None:
-            set_position(output_name, x, y)
+            parts.append(f"position {x} {y}")
+        commands.append(" ".join(parts))
+
+    if commands:
+        # Issue everything as one IPC round-trip; sway applies the
+        # semicolon-separated commands atomically.
+        combined = "; ".join(commands)
+        print(f"Applying workspace '{selected_workspace_name}': {combined}")
+        run_command(combined)
+        invalidate_outputs_cache()
 
 
 def create_new_workspace():
@@ -359,20 +447,17 @@ def create_new_workspace():
     workspace_name = workspace_name_answer["name"].strip()
 
     # Check for duplicate names
-    if any(ws["name"] == workspace_name for ws in workspaces_data["workspaces"]):
+    existing_names = {ws["name"] for ws in workspaces_data["workspaces"]}
+    if workspace_name in existing_names:
         print(f"A workspace named '{workspace_name}' already exists.")
         return
 
     # Manage monitors for the new workspace
     print(f"\nConfiguring monitors for workspace '{workspace_name}':\n")
     try:
-        monitors_data = json.loads(
-            subprocess.run(
-                ["swaymsg", "-t", "get_outputs"], capture_output=True, text=True
-            ).stdout
-        )
-    except json.JSONDecodeError:
-        print("Failed to retrieve monitor information.")
+        monitors_data = get_outputs()
+    except (OSError, ValueError) as e:
+        print(f"Failed to retrieve monitor information: {e}")
         return
 
     if not monitors_data:
@@ -382,11 +467,8 @@ def create_new_workspace():
     workspace_monitors = []
 
     for monitor in monitors_data:
-        output_name = monitor["name"]
-        make = monitor.get("make", "").strip()
-        model = monitor.get("model", "").strip()
-        serial = monitor.get("serial", "").strip()
-        description = f"{make} {model} {serial}".strip()
+        output_name = monitor.name
+        description = monitor.description
 
         # Ask if the user wants to enable the monitor
         state_question = [
@@ -410,17 +492,8 @@ def create_new_workspace():
             inquirer.List(
                 "rotation",
                 message=f"Set rotation for {description} ({output_name}):",
-                choices=[
-                    "normal",
-                    "90",
-                    "180",
-                    "270",
-                    "flipped",
-                    "flipped-90",
-                    "flipped-180",
-                    "flipped-270",
-                ],
-                default=monitor.get("transform", "normal"),
+                choices=ROTATIONS,
+                default=monitor.transform,
             )
         ]
         rotation_answer = inquirer.prompt(rotation_question)
@@ -444,11 +517,10 @@ def create_new_workspace():
             y = 0
         else:
             position_input = position_answer["position"].strip()
-            try:
-                x_str, y_str = position_input.split(",")
-                x = int(x_str.strip())
-                y = int(y_str.strip())
-            except ValueError:
+            parsed = _parse_xy(position_input)
+            if parsed is not None:
+                x, y = parsed
+            else:
                 print("Invalid position format. Using default (0,0).")
                 x = 0
                 y = 0
@@ -492,19 +564,16 @@ def create_current_as_workspace():
     workspace_name = workspace_name_answer["name"].strip()
 
     # Check for duplicate names
-    if any(ws["name"] == workspace_name for ws in workspaces_data["workspaces"]):
+    existing_names = {ws["name"] for ws in workspaces_data["workspaces"]}
+    if workspace_name in existing_names:
         print(f"A workspace named '{workspace_name}' already exists.")
         return
 
     # Get current monitors data
     try:
-        monitors_data = json.loads(
-            subprocess.run(
-                ["swaymsg", "-t", "get_outputs"], capture_output=True, text=True
-            ).stdout
-        )
-    except json.JSONDecodeError:
-        print("Failed to retrieve monitor information.")
+        monitors_data = get_outputs()
+    except (OSError, ValueError) as e:
+        print(f"Failed to retrieve monitor information: {e}")
         return
 
     if not monitors_data:
@@ -514,24 +583,13 @@ def create_current_as_workspace():
     workspace_monitors = []
 
     for monitor in monitors_data:
-        output_name = monitor["name"]
-        make = monitor.get("make", "").strip()
-        model = monitor.get("model", "").strip()
-        serial = monitor.get("serial", "").strip()
-        description = f"{make} {model} {serial}".strip()
-        state = "enable" if monitor["active"] else "disable"
-        transform = monitor.get("transform", "normal")
-        position = monitor.get("rect", {"x": 0, "y": 0})
-        x = position.get("x", 0)
-        y = position.get("y", 0)
-
-        if state != "disable":
+        if monitor.active:
             workspace_monitors.append(
                 {
-                    "description": description,
-                    "state": state,
-                    "transform": transform,
-                    "position": {"x": x, "y": y},
+                    "description": monitor.description,
+                    "state": "enable",
+                    "transform": monitor.transform,
+                    "position": {"x": monitor.x, "y": monitor.y},
                 }
             )
 
@@ -569,10 +627,11 @@ def delete_workspace():
         print("No workspaces selected for deletion.")
         return
 
-    for ws_name in answer["workspaces"]:
-        workspaces_data["workspaces"] = [
-            ws for ws in workspaces_data["workspaces"] if ws["name"] != ws_name
-        ]
+    to_delete = set(answer["workspaces"])
+    workspaces_data["workspaces"] = [
+        ws for ws in workspaces_data["workspaces"] if ws["name"] not in to_delete
+    ]
+    for ws_name in to_delete:
         print(f"Workspace '{ws_name}' deleted.")
 
     save_workspaces(workspaces_data)
@@ -581,13 +640,24 @@ def delete_workspace():
 def validate_position_input(x):
     if not x.strip():
         return True  # Allow empty input
-    try:
-        x_str, y_str = x.split(",")
-        int(x_str.strip())
-        int(y_str.strip())
+    if POSITION_RE.match(x):
         return True
-    except ValueError:
-        return "Please enter position in format x,y where x and y are integers."
+    return "Please enter position in format x,y where x and y are integers."
+
+
+# Menu dispatch tables, keyed by the choice strings shown to the user;
+# "Exit" and "Back to Main Menu" are handled in the loops themselves.
+MAIN_MENU_ACTIONS = {
+    "Manage Monitors": manage_monitors,
+    "Manage Workspaces": manage_workspaces_menu,
+}
+
+WORKSPACE_MENU_ACTIONS = {
+    "Activate a Workspace": activate_workspace,
+    "Create a New Workspace": create_new_workspace,
+    "Create Current Settings as Workspace": create_current_as_workspace,
+    "Delete a Workspace": delete_workspace,
+}
 
 
 if __name__ == "__main__":